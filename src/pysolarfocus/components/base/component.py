@@ -1,23 +1,66 @@
 """Solarfocus abstract component"""
 import logging
+import struct
 
 from ...modbus_wrapper import ModbusConnector
 from .data_value import DataValue
 from .enums import DataTypes, RegisterTypes
+from .part import Part
 from .performance_calculator import PerformanceCalculator
 from .register_slice import RegisterSlice
 
+# Decoders by (is multi-register, data type), registers are big endian
+_DECODERS = {
+    (False, DataTypes.INT): struct.Struct(">h"),
+    (False, DataTypes.UINT): struct.Struct(">H"),
+    (True, DataTypes.INT): struct.Struct(">i"),
+    (True, DataTypes.UINT): struct.Struct(">I"),
+}
+
+# Maximum number of registers a single modbus read can return, limits the reads merged by update_many
+_MAX_READ_COUNT = 125
+
+
+def _pack_registers(registers: list[int]) -> bytes:
+    return struct.pack(f">{len(registers)}H", *registers)
+
 
 class Component:
+    # Attribute names of the DataValues and PerformanceCalculators, cached per class and attribute layout
+    _part_names: dict[tuple[str, ...], tuple[tuple[str, ...], tuple[str, ...]]] = {}
+    # Static parts of the log and repr messages, set per class
+    _class_name = "Component"
+    _repr_header = "\n".join(["=" * 12, _class_name, "=" * 12])
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Every subclass gets its own cache, the declared parts differ between components
+        cls._part_names = {}
+        cls._class_name = cls.__name__
+        cls._repr_header = "\n".join(["=" * 12, cls.__name__, "=" * 12])
+
     def __init__(self, input_address: int, holding_address: int = -1) -> None:
         self.input_address = input_address
         self.input_count = 0
         self.holding_address = holding_address
         self.holding_count = 0
-        self.__data_values = None
-        self.__input_values = None
-        self.__holding_values = None
-        self.__performance_calculators = None
+        # These are set by initialize
+        self.has_input_address = False
+        self.has_holding_address = False
+        self.has_performance_calculators = False
+        self.__data_values: tuple[tuple[str, DataValue], ...] = ()
+        self.__input_values: tuple[tuple[str, DataValue], ...] = ()
+        self.__holding_values: tuple[tuple[str, DataValue], ...] = ()
+        self.__performance_calculators: tuple[tuple[str, PerformanceCalculator], ...] = ()
+        self.__input_slices: list[RegisterSlice] = []
+        self.__holding_slices: list[RegisterSlice] = []
+        self.__input_plan: tuple[tuple[str, DataValue, int, struct.Struct], ...] = ()
+        self.__holding_plan: tuple[tuple[str, DataValue, int, struct.Struct], ...] = ()
+        self.__input_parts: tuple[DataValue, ...] = ()
+        self.__holding_parts: tuple[DataValue, ...] = ()
+        self.__input_block: struct.Struct | None = None
+        self.__holding_block: struct.Struct | None = None
+        self.__repr_sections: tuple[tuple[str, tuple[tuple[str, Part], ...]], ...] = ()
         self.__modbus = None
 
     def initialize(self, modbus: ModbusConnector):
@@ -27,9 +70,13 @@ class Component:
 
         self.__modbus = modbus
 
-        for _, value in self.__get_data_values():
+        self.__scan_parts()
+        self.__input_values = self.__sorted_values(RegisterTypes.INPUT)
+        self.__holding_values = self.__sorted_values(RegisterTypes.HOLDING)
+
+        for _, value in self.__data_values:
 
-            if value.register_type == RegisterTypes.INPUT:
+            if value.register_type is RegisterTypes.INPUT:
                 value.absolut_address = self.input_address
             else:
                 value.absolut_address = self.holding_address
@@ -37,22 +84,44 @@ class Component:
                 value.modbus = modbus
 
         # Dynamically calculate how many registers have to be read
-        if len(self.__get_input_values()) > 0:
-            _, last_input_value = self.__get_input_values()[-1]
+        if len(self.__input_values) > 0:
+            _, last_input_value = self.__input_values[-1]
             self.input_count = last_input_value.address + last_input_value.count
 
-        if len(self.__get_holding_values()) > 0:
-            _, last_holding_value = self.__get_holding_values()[-1]
+        if len(self.__holding_values) > 0:
+            _, last_holding_value = self.__holding_values[-1]
             self.holding_count = last_holding_value.address + last_holding_value.count
 
+        self.has_input_address = self.input_address >= 0 and self.input_count > 0
+        self.has_holding_address = self.holding_address >= 0 and self.holding_count > 0
+        self.has_performance_calculators = len(self.__performance_calculators) > 0
+
         # Calculate the address slices we need to read
         # This is necessary because the modbus protocol can block the read/write of some registers
         # => if one of these registers is between the start and end address of the read/write we need to skip it
-        self.__input_slices = Component._calculate_ranges([v for (n, v) in self.__get_input_values()])
-        self.__holding_slices = Component._calculate_ranges([v for (n, v) in self.__get_holding_values()])
+        for register_slice in self.__input_slices + self.__holding_slices:
+            # Slices of a previous initialize are replaced => reuse them
+            register_slice.release()
+        self.__input_slices = Component._calculate_ranges([v for (n, v) in self.__input_values])
+        self.__holding_slices = Component._calculate_ranges([v for (n, v) in self.__holding_values])
 
-        # Initialize has_performance_calculators
-        self.__get_performance_calculators()
+        # The register layout is fixed => precompute how each DataValue is decoded
+        self.__input_plan = Component.__build_parse_plan(self.__input_values)
+        self.__holding_plan = Component.__build_parse_plan(self.__holding_values)
+        self.__input_parts = tuple(v for _, v in self.__input_values)
+        self.__holding_parts = tuple(v for _, v in self.__holding_values)
+        self.__input_block = Component.__build_block_decoder(self.__input_plan)
+        self.__holding_block = Component.__build_block_decoder(self.__holding_plan)
+
+        # Only the values change between polls => prepare the static part of each repr line
+        sections = []
+        if self.has_input_address:
+            sections.append(("---Input:", self.__input_values))
+        if self.has_holding_address:
+            sections.append(("---Holding:", self.__holding_values))
+        if self.has_performance_calculators:
+            sections.append(("---Calculations:", self.__performance_calculators))
+        self.__repr_sections = tuple((title, tuple((f"{name} | raw:", part) for name, part in parts)) for title, parts in sections)
 
         return self
 
@@ -60,6 +129,7 @@ class Component:
     def holding_slices(self) -> list[RegisterSlice]:
         """
         Returns the address slices of the holding registers
+        The slices are handed back to the pool by a further initialize() and reused, do not keep them
         """
         return self.__holding_slices
 
@@ -67,6 +137,7 @@ class Component:
     def input_slices(self) -> list[RegisterSlice]:
         """
         Returns the address slices of the input registers
+        The slices are handed back to the pool by a further initialize() and reused, do not keep them
         """
         return self.__input_slices
 
@@ -75,72 +146,76 @@ class Component:
         slices = []
         if len(datavalues) < 1:
             return slices
-        current_slice = RegisterSlice(datavalues[0].get_absolute_address(), datavalues[0].address, datavalues[-1].address + datavalues[-1].count)
-        for i, datavalue in enumerate(datavalues[:-1]):
-            if datavalue.address + datavalue.count != datavalues[i + 1].address:
-                # A gap was found => define the range from the start of the current slice to the end of the current address+count
-                current_slice.count = (datavalue.address + datavalue.count) - current_slice.relative_address
-                slices.append(current_slice)
-                # the new count is the distance between the next address and the last address
-                new_count = (datavalues[-1].address + datavalues[-1].count) - datavalues[i + 1].address
-                current_slice = RegisterSlice(datavalues[i + 1].get_absolute_address(), datavalues[i + 1].address, new_count)
-        slices.append(current_slice)
+        values = iter(datavalues)
+        first_value = next(values)
+        # All DataValues of one register type share the absolute address of the Component
+        absolute_address = first_value.absolut_address
+        start_address = first_value.address
+        end_address = first_value.address + first_value.count
+        for datavalue in values:
+            if datavalue.address != end_address:
+                # A gap was found => define the range from the start of the current slice to the end of the previous address+count
+                slices.append(RegisterSlice.acquire(absolute_address + start_address, start_address, end_address - start_address))
+                start_address = datavalue.address
+            end_address = datavalue.address + datavalue.count
+        slices.append(RegisterSlice.acquire(absolute_address + start_address, start_address, end_address - start_address))
         return slices
 
-    @property
-    def has_input_address(self) -> bool:
-        return self.input_address >= 0 and self.input_count > 0
-
-    @property
-    def has_holding_address(self) -> bool:
-        return self.holding_address >= 0 and self.holding_count > 0
-
-    @property
-    def has_performance_calculators(self) -> bool:
-        return len(self.__get_performance_calculators()) > 0
-
-    def __get_data_values(self) -> list[tuple[str, DataValue]]:
+    def __scan_parts(self) -> None:
         """
-        Returns all DataValues of this Component
+        Collects the DataValues and PerformanceCalculators of this Component
         """
-        if self.__data_values is None:
-            self.__data_values = [(k, v) for k, v in self.__dict__.items() if isinstance(v, DataValue)]
-        return self.__data_values
+        # The parts can depend on the api version => the attribute layout is part of the cache key
+        layout = tuple(self.__dict__)
+        names = type(self)._part_names.get(layout)
+        if names is None:
+            data_value_names = tuple(k for k, v in self.__dict__.items() if isinstance(v, DataValue))
+            calculator_names = tuple(k for k, v in self.__dict__.items() if isinstance(v, PerformanceCalculator))
+            names = type(self)._part_names[layout] = (data_value_names, calculator_names)
+        data_value_names, calculator_names = names
+        self.__data_values = tuple((n, getattr(self, n)) for n in data_value_names)
+        self.__performance_calculators = tuple((n, getattr(self, n)) for n in calculator_names)
 
-    def __get_input_values(self) -> list[tuple[str, DataValue]]:
+    def __sorted_values(self, register_type: RegisterTypes) -> tuple[tuple[str, DataValue], ...]:
         """
-        Get sorted list of all DataValues with RegisterType Input
+        Get all DataValues of the given RegisterType sorted by address
         """
-        if self.__input_values is None:
-            self.__input_values = [(k, v) for k, v in self.__get_data_values() if v.register_type == RegisterTypes.INPUT]
-            self.__input_values = sorted(self.__input_values, key=lambda item: item[1].address)
-        return self.__input_values
+        # Sort plain tuples instead of calling a key function, the index keeps the sort stable for equal addresses
+        values = sorted((v.address, i, k, v) for i, (k, v) in enumerate(self.__data_values) if v.register_type is register_type)
+        return tuple((k, v) for _, _, k, v in values)
 
-    def __get_holding_values(self) -> list[tuple[str, DataValue]]:
+    @staticmethod
+    def __build_parse_plan(values: tuple[tuple[str, DataValue], ...]) -> tuple[tuple[str, DataValue, int, struct.Struct], ...]:
         """
-        Get sorted list of all DataValues with RegisterType Holding
+        Returns (name, value, address, decoder) for each DataValue
         """
-        if self.__holding_values is None:
-            self.__holding_values = [(k, v) for k, v in self.__get_data_values() if v.register_type == RegisterTypes.HOLDING]
-            self.__holding_values = sorted(self.__holding_values, key=lambda item: item[1].address)
-        return self.__holding_values
+        # The decoders are keyed by (count == 2, data_type)
+        return tuple((name, value, value.address, _DECODERS[(value.count == 2, value.data_type)]) for name, value in values)
 
-    def __get_performance_calculators(self) -> list[tuple[str, PerformanceCalculator]]:
+    @staticmethod
+    def __build_block_decoder(plan: tuple[tuple[str, DataValue, int, struct.Struct], ...]) -> struct.Struct | None:
         """
-        Returns all PerformanceCalculators of this Component
+        Returns a decoder for all DataValues of the plan at once or None if DataValues overlap
         """
-        if self.__performance_calculators is None:
-            self.__performance_calculators = [(k, v) for k, v in self.__dict__.items() if isinstance(v, PerformanceCalculator)]
-        return self.__performance_calculators
-
-    @staticmethod
-    def __unsigned_to_signed(number: int, byte_count: int) -> int:
-        return int.from_bytes(number.to_bytes(byte_count, "little", signed=False), "little", signed=True)
+        layout = [">"]
+        end_address = 0
+        for _, _, address, decoder in plan:
+            if address < end_address:
+                return None
+            # Skip the registers in between
+            layout.append("xx" * (address - end_address))
+            layout.append(decoder.format[1:])
+            end_address = address + decoder.size // 2
+        return struct.Struct("".join(layout))
 
     def update(self) -> bool:
         """
         Retrieve current values from the heating system
         """
+        if not (self.has_input_address or self.has_holding_address):
+            # Nothing to read
+            return True
+
         failed = False
         if self.has_input_address:
             read_success, registers = self.__modbus.read_input_registers(self.input_slices, self.input_count)
@@ -149,7 +224,7 @@ class Component:
                 parsing_success = self._parse(registers, RegisterTypes.INPUT) and read_success
             failed = not parsing_success and read_success or failed
             if failed:
-                logging.error(f"Failed to read input registers of {self.__class__.__name__}")
+                logging.error("Failed to read input registers of %s", self._class_name)
 
         if self.has_holding_address:
             read_success, registers = self.__modbus.read_holding_registers(self.holding_slices, self.holding_count)
@@ -158,53 +233,104 @@ class Component:
                 parsing_success = self._parse(registers, RegisterTypes.HOLDING) and read_success
             failed = not (parsing_success and read_success) or failed
             if failed:
-                logging.error(f"Failed to read holding registers of {self.__class__.__name__}")
+                logging.error("Failed to read holding registers of %s", self._class_name)
         return not failed
 
+    @staticmethod
+    def update_many(components: list["Component"], modbus: ModbusConnector) -> bool:
+        """
+        Retrieve current values of several Components from the heating system
+        Adjacent register slices of different Components are read together, a failed read fails all Components sharing it
+        Opt-in alternative to calling update() on each Component, overrides of update() are not called
+        Only useful for custom Components with contiguous register layouts, SolarfocusAPI.update() does not use it
+        """
+        success = True
+        for register_type in (RegisterTypes.INPUT, RegisterTypes.HOLDING):
+            if register_type is RegisterTypes.INPUT:
+                parts = [(s, c) for c in components if c.has_input_address for s in c.input_slices]
+                read = modbus.read_input_registers
+            else:
+                parts = [(s, c) for c in components if c.has_holding_address for s in c.holding_slices]
+                read = modbus.read_holding_registers
+            if len(parts) < 1:
+                continue
+            parts.sort(key=lambda part: part[0].absolute_address)
+
+            # The slices are placed one after another in the combined result, adjacent slices are merged into one read
+            merged_slices = []
+            offsets = []
+            count = 0
+            for register_slice, _ in parts:
+                previous_slice = merged_slices[-1] if merged_slices else None
+                if (
+                    previous_slice is not None
+                    and previous_slice.absolute_address + previous_slice.count == register_slice.absolute_address
+                    and previous_slice.count + register_slice.count <= _MAX_READ_COUNT
+                ):
+                    previous_slice.count += register_slice.count
+                else:
+                    merged_slices.append(RegisterSlice(register_slice.absolute_address, count, register_slice.count))
+                offsets.append(count)
+                count += register_slice.count
+
+            read_success, registers = read(merged_slices, count)
+            if not read_success:
+                for component in dict.fromkeys(c for _, c in parts):
+                    logging.error("Failed to read %s registers of %s", register_type.value.lower(), component._class_name)
+                success = False
+                continue
+
+            # Distribute the registers back to the Components
+            component_data = {}
+            for (register_slice, component), offset in zip(parts, offsets):
+                if component not in component_data:
+                    component_data[component] = [0] * (component.input_count if register_type is RegisterTypes.INPUT else component.holding_count)
+                data = component_data[component]
+                data[register_slice.relative_address : register_slice.relative_address + register_slice.count] = registers[offset : offset + register_slice.count]
+            for component, data in component_data.items():
+                if not component._parse(data, register_type):
+                    logging.error("Failed to read %s registers of %s", register_type.value.lower(), component._class_name)
+                    success = False
+        return success
+
     def _parse(self, data: list[int], type: RegisterTypes) -> bool:
         """
         Dynamically assigns the values to the DataValues of this Component
         """
-        if len(data) != (self.input_count if type == RegisterTypes.INPUT else self.holding_count):
-            logging.error(
-                f"Data length does not match the expected length of {self.input_count if type == RegisterTypes.INPUT else self.holding_count} for {self.__class__.__name__}"
-            )
+        if type is RegisterTypes.INPUT:
+            expected_count, plan, parts, block = self.input_count, self.__input_plan, self.__input_parts, self.__input_block
+        else:
+            expected_count, plan, parts, block = self.holding_count, self.__holding_plan, self.__holding_parts, self.__holding_block
+        if len(data) != expected_count:
+            logging.error("Data length does not match the expected length of %d for %s", expected_count, self._class_name)
             return False
 
+        try:
+            buffer = _pack_registers(data)
+            if block is not None:
+                raw_values = block.unpack_from(buffer)
+            else:
+                # Overlapping DataValues can't be decoded in one go
+                raw_values = [decoder.unpack_from(buffer, address * 2)[0] for _, _, address, decoder in plan]
+            for value, raw_value in zip(parts, raw_values):
+                value.value = raw_value
+            return True
+        except struct.error:
+            pass
+
+        # At least one value is invalid => parse each value on its own to find the culprits
         encountered_error = False
-        for name, value in self.__get_input_values() if type == RegisterTypes.INPUT else self.__get_holding_values():
+        for name, value, address, decoder in plan:
             try:
-                # Multi-register values (UINT32, INT32)
-                if value.count == 2:
-                    _value = (data[value.address] << 16) + data[value.address + 1]
-                else:
-                    _value = data[value.address]
-
-                # Datatype
-                if value.data_type == DataTypes.INT:
-                    _value = Component.__unsigned_to_signed(_value, value.count * 2)
-
-                # Store
-                value.value = _value
-            except:
-                logging.exception(f"Error while parsing {name} of {self.__class__.__name__}")
+                (value.value,) = decoder.unpack(_pack_registers(data[address : address + decoder.size // 2]))
+            except struct.error:
+                logging.exception("Error while parsing %s of %s", name, self._class_name)
                 encountered_error = True
         return not encountered_error
 
     def __repr__(self) -> str:
-        message = ["=" * 12]
-        message.append(f"{self.__class__.__name__}")
-        message.append("=" * 12)
-        if self.has_input_address:
-            message.append("---Input:")
-            for name, value in self.__get_input_values():
-                message.append(f"{name} | raw:{value.value} scaled:{value.scaled_value}")
-        if self.has_holding_address:
-            message.append("---Holding:")
-            for name, value in self.__get_holding_values():
-                message.append(f"{name} | raw:{value.value} scaled:{value.scaled_value}")
-        if self.has_performance_calculators:
-            message.append("---Calculations:")
-            for name, value in self.__get_performance_calculators():
-                message.append(f"{name} | raw:{value.value} scaled:{value.scaled_value}")
+        message = [self._repr_header]
+        for title, lines in self.__repr_sections:
+            message.append(title)
+            message.extend(prefix + str(part.value) + " scaled:" + str(part.scaled_value) for prefix, part in lines)
         return "\n".join(message)
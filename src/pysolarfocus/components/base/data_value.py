@@ -12,6 +12,8 @@ class DataValue(Part):
     Abstraction of a certain relative address in the modbus register
     """
 
+    __slots__ = ("address", "count", "value", "multiplier", "data_type", "register_type", "absolut_address", "modbus")
+
     data_type: DataTypes
     address: int
     count: int
@@ -59,7 +61,7 @@ class DataValue(Part):
         """
         if self.has_scaler:
             # Input registers are scaled differently than holding registers
-            if self.register_type == RegisterTypes.INPUT:
+            if self.register_type is RegisterTypes.INPUT:
                 return self.value * self.multiplier
             return self.value / self.multiplier
         return self.value
@@ -70,7 +72,7 @@ class DataValue(Part):
         """
         if self.has_scaler:
             # Input registers are scaled differently than holding registers
-            if self.register_type == RegisterTypes.INPUT:
+            if self.register_type is RegisterTypes.INPUT:
                 return value / self.multiplier
             return value * self.multiplier
         return value
@@ -8,3 +8,27 @@ class RegisterSlice:
     absolute_address: int
     relative_address: int
     count: int
+
+    @classmethod
+    def acquire(cls, absolute_address: int, relative_address: int, count: int) -> "RegisterSlice":
+        """
+        Returns a released slice with the given values or a new one if none is available
+        """
+        try:
+            # pop() is atomic, checking the pool first could race with another thread
+            register_slice = _slice_pool.pop()
+        except IndexError:
+            return cls(absolute_address, relative_address, count)
+        register_slice.absolute_address = absolute_address
+        register_slice.relative_address = relative_address
+        register_slice.count = count
+        return register_slice
+
+    def release(self) -> None:
+        """
+        Hands this slice back for reuse, it must not be used afterwards
+        """
+        _slice_pool.append(self)
+
+
+_slice_pool: list[RegisterSlice] = []
@@ -39,7 +39,8 @@ class ModbusConnector:
             logging.error("Connection to modbus is not established!")
             return False, None
         try:
-            combined_result = [None] * count
+            # Skipped registers are not part of any value => report them as 0
+            combined_result = [0] * count
             for register_slice in slices:
                 result = self.client.read_input_registers(address=register_slice.absolute_address, count=register_slice.count, **self.__slave_args)
                 if result.isError():
@@ -58,7 +59,8 @@ class ModbusConnector:
             logging.error("Connection to modbus is not established!")
             return False, None
         try:
-            combined_result = [None] * count
+            # Skipped registers are not part of any value => report them as 0
+            combined_result = [0] * count
             for register_slice in slices:
                 result = self.client.read_holding_registers(address=register_slice.absolute_address, count=register_slice.count, **self.__slave_args)
                 if result.isError():
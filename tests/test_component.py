@@ -1,5 +1,37 @@
 from pysolarfocus.components.base.component import Component
 from pysolarfocus.components.base.data_value import DataValue
+from pysolarfocus.components.base.enums import DataTypes, RegisterTypes
+
+
+class _ParseComponent(Component):
+    def __init__(self, input_address: int = 500, holding_address: int = 32000) -> None:
+        super().__init__(input_address=input_address, holding_address=holding_address)
+        self.signed = DataValue(address=0)
+        self.unsigned = DataValue(address=1, data_type=DataTypes.UINT)
+        self.signed_double = DataValue(address=2, count=2)
+        self.unsigned_double = DataValue(address=4, count=2, data_type=DataTypes.UINT)
+        self.holding = DataValue(address=0, register_type=RegisterTypes.HOLDING)
+        self.holding_skipped = DataValue(address=3, count=2, data_type=DataTypes.UINT, register_type=RegisterTypes.HOLDING)
+
+
+class _FakeModbus:
+    def __init__(self, registers: dict[int, int]) -> None:
+        self.registers = registers
+        self.reads = []
+
+    def __read(self, slices, count):
+        result = [0] * count
+        for register_slice in slices:
+            self.reads.append((register_slice.absolute_address, register_slice.count))
+            for i in range(register_slice.count):
+                result[register_slice.relative_address + i] = self.registers.get(register_slice.absolute_address + i, 0)
+        return True, result
+
+    def read_input_registers(self, slices, count):
+        return self.__read(slices, count)
+
+    def read_holding_registers(self, slices, count):
+        return self.__read(slices, count)
 
 
 def _assign_absolute_addresses(data_values: list[DataValue], start_address):
@@ -104,3 +136,87 @@ def test_calculate_ranges_handles_multiple_skipped_values():
     assert slices[2].absolute_address == absolute_address + 5
     assert slices[2].relative_address == 5
     assert slices[2].count == 3
+
+
+def test_calculate_ranges_handles_offset_start():
+    # Holding registers do not necessarily start at relative address 0
+    absolute_address = 33400
+    data_values = [
+        DataValue(address=10),
+        DataValue(address=11),
+    ]
+    _assign_absolute_addresses(data_values, absolute_address)
+    slices = Component._calculate_ranges(data_values)
+    assert len(slices) == 1
+    assert slices[0].absolute_address == absolute_address + 10
+    assert slices[0].relative_address == 10
+    assert slices[0].count == 2
+
+
+def test_initialize_reuses_released_slices():
+    component = _ParseComponent().initialize(None)
+    input_slice = component.input_slices[0]
+    component.initialize(None)
+    assert any(register_slice is input_slice for register_slice in component.input_slices + component.holding_slices)
+    assert component.input_slices[0].count == 6
+    assert component.holding_slices[1].count == 2
+
+
+def test_parse_decodes_signed_and_multiregister_values():
+    component = _ParseComponent().initialize(None)
+    assert component.input_count == 6
+    assert component.holding_count == 5
+    assert component._parse([0xFFFF, 0xFFFF, 0xFFFF, 0xFFFE, 0x0001, 0x0002], RegisterTypes.INPUT)
+    assert component.signed.value == -1
+    assert component.unsigned.value == 0xFFFF
+    assert component.signed_double.value == -2
+    assert component.unsigned_double.value == 0x00010002
+    assert component._parse([0x8000, 0, 0, 0x0001, 0x0002], RegisterTypes.HOLDING)
+    assert component.holding.value == -0x8000
+    assert component.holding_skipped.value == 0x00010002
+
+
+def test_parse_rejects_unexpected_length():
+    component = _ParseComponent().initialize(None)
+    assert not component._parse([0, 0, 0], RegisterTypes.INPUT)
+
+
+def test_parse_keeps_valid_values_on_error():
+    component = _ParseComponent().initialize(None)
+    assert not component._parse([1, 2, None, 0, 0, 3], RegisterTypes.INPUT)
+    assert component.signed.value == 1
+    assert component.unsigned.value == 2
+    assert component.unsigned_double.value == 3
+
+
+def test_parse_handles_overlapping_values():
+    component = _ParseComponent()
+    component.low_word = DataValue(address=5, data_type=DataTypes.UINT)
+    component.initialize(None)
+    assert component._parse([0, 0, 0, 0, 0x0001, 0x0002], RegisterTypes.INPUT)
+    assert component.unsigned_double.value == 0x00010002
+    assert component.low_word.value == 0x0002
+
+
+def test_update_many_merges_adjacent_slices():
+    modbus = _FakeModbus({500: 0xFFFF, 506: 7, 32000: 1, 32050: 2, 32053: 0x0001, 32054: 0x0002})
+    components = [_ParseComponent(500, 32000).initialize(modbus), _ParseComponent(506, 32050).initialize(modbus)]
+    assert Component.update_many(components, modbus)
+    # Input registers 500-511 are read at once, the holding registers have gaps
+    assert modbus.reads == [(500, 12), (32000, 1), (32003, 2), (32050, 1), (32053, 2)]
+    assert components[0].signed.value == -1
+    assert components[1].signed.value == 7
+    assert components[0].holding.value == 1
+    assert components[1].holding.value == 2
+    assert components[1].holding_skipped.value == 0x00010002
+
+
+def test_update_many_logs_components_of_failed_read(caplog):
+    class _FailingHoldingModbus(_FakeModbus):
+        def read_holding_registers(self, slices, count):
+            return False, None
+
+    modbus = _FailingHoldingModbus({})
+    components = [_ParseComponent(500, -1).initialize(modbus), _ParseComponent(506, -1).initialize(modbus), _ParseComponent(512, 32000).initialize(modbus)]
+    assert not Component.update_many(components, modbus)
+    assert [r.getMessage() for r in caplog.records] == ["Failed to read holding registers of _ParseComponent"]